@@ -27,6 +27,8 @@ class AddSourceFiles(LocTask):
 
     export_pattern: str = '/{target}/%locale%/{target}.po'
 
+    max_parallel_uploads: int = 8  # Files uploaded at once
+
     # TODO: Do I need this here? Or rather in smth from uetools lib?
     content_dir: str = '../'
 
@@ -46,18 +48,28 @@ class AddSourceFiles(LocTask):
 
         logger.info(f'Content path: {self._content_path}')
 
+        fpaths = {
+            self._content_path / self._fname.format(target=target): target
+            for target in self.loc_targets
+        }
+        logger.info(
+            f'Uploading files ({len(fpaths)}): {list(fpaths)}. Format: {self.file_format}'
+        )
+
         targets_processed = []
 
-        for target in self.loc_targets:
-            fpath = self._content_path / self._fname.format(target=target)
-            logger.info(f'Uploading file: {fpath}. Format: {self.file_format}')
-            r = crowdin.add_file(
-                fpath,
-                type=self.file_format,
-                export_pattern=self.export_pattern.format(target=target),
-            )
+        results = crowdin.add_files(
+            {
+                fpath: self.export_pattern.format(target=target)
+                for fpath, target in fpaths.items()
+            },
+            max_workers=self.max_parallel_uploads,
+            type=self.file_format,
+        )
+        for fpath, r in results.items():
+            target = fpaths[fpath]
             if isinstance(r, int):
-                targets_processed += [target]
+                targets_processed.append(target)
                 logger.info(f'File for {target} added.')
             else:
                 logger.error(
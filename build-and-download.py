@@ -1,9 +1,11 @@
 from dataclasses import dataclass, field
 from zipfile import ZipFile
+import os
+import errno
 import shutil
-import requests
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from time import sleep
+from random import uniform
 from loguru import logger
 
 from libraries.utilities import LocTask
@@ -57,7 +59,7 @@ class BuildAndDownloadTranslations(LocTask):
         self._zip_path = self._content_path / self.zip_name
         self._temp_path = self._content_path / self.temp_dir
 
-    def build_and_download(self):
+    def build_and_download(self) -> bool:
         crowdin = UECrowdinClient(
             self.token, logger, self.organization, self.project_id
         )
@@ -70,23 +72,43 @@ class BuildAndDownloadTranslations(LocTask):
             )
             build_data = crowdin.check_or_build(build_data)
         else:
+            delay = 1.0
+            last_status = None
             while not 'url' in build_data:
-                logger.info(
-                    f'Build status and progress: {build_data["status"]} / {build_data["progress"]}'
-                )
-                sleep(10)
+                status = (build_data.get('status'), build_data.get('progress'))
+                if status[0] in ('failed', 'canceled'):
+                    logger.error(f'Build {status[0]}. Build data:\n{build_data}')
+                    return False
+                if status != last_status:
+                    logger.info(f'Build status and progress: {status[0]} / {status[1]}')
+                    # The link shows up shortly after the build hits 100%,
+                    # so drop back to a short wait once instead of backing off
+                    if status[1] == 100:
+                        delay = 1.0
+                    last_status = status
+                sleep(delay + uniform(0, delay * 0.1))
+                delay = min(delay * 1.7, 30.0)
                 build_data = crowdin.check_or_build(build_data)
 
         logger.info(
             f'Build compelete. Trying to download {build_data["url"]} to: {self._zip_path}'
         )
 
-        response = requests.get(build_data['url'])
         self._zip_path.parent.mkdir(parents=True, exist_ok=True)
-        self._zip_path.touch(exist_ok=True)
-        self._zip_path.write_bytes(response.content)
+        with crowdin.session.get(
+            build_data['url'], stream=True, timeout=60
+        ) as response:
+            response.raise_for_status()
+            # Download to a .part file so an interrupted download
+            # never leaves a truncated archive behind
+            part_path = self._zip_path.with_suffix('.part')
+            with open(part_path, 'wb', buffering=1 << 20) as f:
+                for chunk in response.iter_content(1 << 20):
+                    f.write(chunk)
+        os.replace(part_path, self._zip_path)
 
         logger.info('Download complete.')
+        return True
 
     def unzip_file(self):
 
@@ -96,12 +118,92 @@ class BuildAndDownloadTranslations(LocTask):
 
         logger.info(f'Extracted to {self._temp_path}')
 
+    def get_dest_path(self, target: str) -> Path:
+        if self._content_path and self._content_path.is_dir():
+            return self._content_path.absolute() / self.dest_dir.format(target=target)
+
+        logger.info(
+            'Resolving target directory assuming the file is in /Game/Content/Python/'
+        )
+        dest_path = Path(
+            __file__
+        ).absolute().parent.parent.parent / self.dest_dir.format(target=target)
+        logger.info(dest_path)
+
+        return dest_path
+
+    def extract_and_place(self) -> bool:
+        '''
+        Streams PO files straight from the downloaded archive to their
+        destination in the Localization directory, skipping the temp directory.
+        Only overwrites POs that already exist for the target.
+        '''
+        logger.info(f'Targets to process ({len(self.loc_targets)}): {self.loc_targets}')
+
+        targets = set(self.loc_targets)
+        locales_to_delete = set(self.locales_to_delete)
+        dest_paths = {target: self.get_dest_path(target) for target in targets}
+        processed = {target: [] for target in targets}
+
+        with ZipFile(self._zip_path, 'r') as zipfile:
+            for info in zipfile.infolist():
+                parts = PurePosixPath(info.filename).parts
+                if (
+                    len(parts) != 3
+                    or parts[0] not in targets
+                    or parts[1] in locales_to_delete
+                    or parts[2] != f'{parts[0]}.po'
+                ):
+                    continue
+
+                target, locale, fname = parts
+                dst_path = (
+                    dest_paths[target]
+                    / self.culture_mappings.get(locale, locale)
+                    / fname
+                )
+                if not dst_path.exists():
+                    logger.warning(f'Skip: {info.filename} → {dst_path} / False')
+                    continue
+
+                logger.opt(lazy=True).debug(
+                    'Extracting {} to {}', lambda: info.filename, lambda: dst_path
+                )
+                # Extract next to the PO and swap it in, so a failed
+                # extraction never leaves a truncated PO in the project
+                part_path = dst_path.with_name(dst_path.name + '.part')
+                try:
+                    with zipfile.open(info) as src, open(part_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+                    os.replace(part_path, dst_path)
+                except BaseException:
+                    part_path.unlink(missing_ok=True)
+                    raise
+                processed[target].append(locale)
+
+        targets_processed = [t for t in self.loc_targets if processed.get(t)]
+        for target in targets_processed:
+            logger.info(
+                f'Locales processed for {target} '
+                f'({len(processed[target])}): {processed[target]}'
+            )
+
+        if targets_processed:
+            logger.info(
+                f'Targets processed ({len(targets_processed)}): {targets_processed}'
+            )
+            self._zip_path.unlink()
+            return True
+
+        logger.warning('No targets processed.')
+
+        return False
+
     def process_target(self, target: str) -> bool:
         logger.info(f'---\nProcessing localization target: {target}')
-        if not (self._temp_path / target).is_dir():
-            logger.error(
-                f'{self._temp_path / target} directory not found for target {target}'
-            )
+        target_path = self._temp_path / target
+        if not target_path.is_dir():
+            logger.error(f'{target_path} directory not found for target {target}')
             return False
 
         logger.info(
@@ -109,45 +211,52 @@ class BuildAndDownloadTranslations(LocTask):
         )
 
         for loc in self.locales_to_delete:
-            item = self._temp_path / target / loc
-            if item.is_file():
+            item = target_path / loc
+            try:
                 item.unlink()
-            elif item.is_dir():
+            except FileNotFoundError:
+                pass
+            except (IsADirectoryError, PermissionError):
+                # Windows raises PermissionError when unlinking a directory
                 shutil.rmtree(item)
 
-        if self._content_path and self._content_path.is_dir():
-            dest_path = self._content_path.absolute() / self.dest_dir.format(
-                target=target
-            )
-        else:
-            logger.info(
-                'Resolving target directory assuming the file is in /Game/Content/Python/'
-            )
-            dest_path = Path(
-                __file__
-            ).absolute().parent.parent.parent / self.dest_dir.format(target=target)
-            logger.info(dest_path)
+        dest_path = self.get_dest_path(target)
 
         logger.info(f'Destination directory: {dest_path}')
 
         logger.info('Copying PO files...')
 
         processed = []
-        directories = [f for f in (self._temp_path / target).glob('*') if f.is_dir()]
+        with os.scandir(target_path) as entries:
+            directories = [
+                Path(e.path) for e in entries if e.is_dir(follow_symlinks=False)
+            ]
         for dir in directories:
             src_path = dir / f'{target}.po'
             locale = dir.name
             if dir.name in self.culture_mappings:
                 locale = self.culture_mappings[locale]
             dst_path = dest_path / locale / f'{target}.po'
-            if src_path.exists() and dst_path.exists():
-                logger.info(f'Moving {src_path} to {dst_path}')
-                shutil.move(src_path, dst_path)
-                processed += [dir.name]
-            else:
-                logger.warning(
-                    f'Skip: {src_path} / {src_path.exists()} → {dst_path} / {dst_path.exists()}'
-                )
+            # Only overwrite POs that already exist in the project
+            if not dst_path.exists():
+                logger.warning(f'Skip: {src_path} → {dst_path} / False')
+                continue
+
+            logger.opt(lazy=True).debug(
+                'Moving {} to {}', lambda: src_path, lambda: dst_path
+            )
+            try:
+                os.replace(src_path, dst_path)
+            except FileNotFoundError:
+                logger.warning(f'Skip: {src_path} / False → {dst_path}')
+                continue
+            except OSError as err:
+                # Temp dir is on another drive, fall back to copying
+                if err.errno != errno.EXDEV:
+                    raise
+                shutil.copyfile(src_path, dst_path)
+                src_path.unlink()
+            processed.append(dir.name)
 
         logger.info(f'Locales processed ({len(processed)}): {processed}\n')
 
@@ -162,7 +271,7 @@ class BuildAndDownloadTranslations(LocTask):
         targets_processed = []
         for t in self.loc_targets:
             if self.process_target(t):
-                targets_processed += [t]
+                targets_processed.append(t)
 
         shutil.rmtree(self._temp_path)
 
@@ -197,11 +306,7 @@ def main():
 
     task.read_config(Path(__file__).name, logger)
 
-    task.build_and_download()
-
-    task.unzip_file()
-
-    result = task.process_loc_targets()
+    result = task.build_and_download() and task.extract_and_place()
 
     logger.info('--- Build, download, and move script end ---')
 
@@ -1,11 +1,32 @@
 import re
 import csv
+import string
+from operator import itemgetter
 from pathlib import Path
 from dataclasses import dataclass, field
 from loguru import logger
 
-from libraries.utilities import LocTask
-from libraries.crowdin import UECrowdinClient
+from libraries.utilities import (
+    LocTask,
+    write_csv,
+    cached_json,
+    refresh_cache_requested,
+)
+
+# Characters to strip from translator names
+NAME_SANITIZE_REGEX = re.compile(r'[^\w\(\)\-]')
+# Same rule as a translate table for pure ASCII names (most of them)
+NAME_SANITIZE_ASCII = {
+    i: None
+    for i in range(128)
+    if chr(i) not in string.ascii_letters + string.digits + '_()-'
+}
+
+
+def sanitize_name(name: str) -> str:
+    if name.isascii():
+        return name.translate(NAME_SANITIZE_ASCII)
+    return NAME_SANITIZE_REGEX.sub('', name)
 
 
 @dataclass
@@ -25,6 +46,9 @@ class UpdateCommunityCredits(LocTask):
     # Relative to Game/Content directory
     csv_name: str = 'Path/To/CSV_Source_For_Datatable.csv'
     csv_encoding: str = 'utf-16-le'
+    # Header row of the CSV, e.g., ['---', 'Language', 'Credits']
+    # If not set, it's read from the existing CSV
+    csv_header: list = None
 
     # How many words people should translate or approve to get into the credits
     # It's better to keep the values once set, otherwise some older translators might be
@@ -38,45 +62,76 @@ class UpdateCommunityCredits(LocTask):
     # List of languages to exclude ()
     languages_to_exclude: list = None
 
+    # Reports take a while to generate, reuse them on re-runs (see cached_json)
+    cache_path: str = 'Localization/~Temp/Cache/top-translators.json'
+    cache_ttl_hours: float = 6
+    refresh_cache: bool = False
+
+    max_parallel_requests: int = 8  # Language reports generated at once
+
     # TODO: Do I need this here? Or rather in smth from uetools lib?
     content_dir: str = '../'
 
     _csv_path: Path = None
     _content_path: Path = None
+    _cache_path: Path = None
+    _users_to_exclude: frozenset = None
+    _languages_to_exclude: frozenset = None
 
     def post_update(self):
         super().post_update()
         self._content_path = Path(self.content_dir)
         self._csv_path = self._content_path / self.csv_name
+        self._cache_path = self._content_path / self.cache_path
+        self._users_to_exclude = frozenset(self.users_to_exclude or ())
+        self._languages_to_exclude = frozenset(self.languages_to_exclude or ())
 
-    def update_community_credits(self):
-
-        reports = {}
-
-        # with open('rep_json.txt', mode='r', encoding='utf-8') as f:
-        #    reports = json.loads(f.readline())
+    def fetch_reports(self) -> dict:
+        # Imported here, so a cached run doesn't load crowdin_api at all
+        from libraries.crowdin import UECrowdinClient
 
         crowdin = UECrowdinClient(
             self.token, logger, self.organization, self.project_id
         )
 
-        reports = crowdin.get_top_translators()
+        reports = crowdin.get_top_translators(max_workers=self.max_parallel_requests)
+
+        if not reports or not all(
+            isinstance(r, dict) and 'language_id' in r for r in reports.values()
+        ):
+            logger.error(f'Could not get the reports from Crowdin: {reports}')
+            return None
+
+        return reports
+
+    def update_community_credits(self):
+
+        reports = cached_json(
+            self._cache_path,
+            self.cache_ttl_hours,
+            self.fetch_reports,
+            key=self.project_id,
+            refresh=self.refresh_cache,
+            logger=logger,
+        )
+
+        if not reports:
+            return False
 
         logger.info('Got the reports from Crowdin. Processing...')
 
-        fields = []
         rows = []
 
-        with open(
-            self._csv_path, mode='r', encoding=self.csv_encoding, newline=''
-        ) as csv_file:
-            csv_reader = csv.reader(csv_file)
-            fields = next(csv_reader)
+        # Only the header is needed, the rows are rebuilt from the reports
+        fields = self.csv_header
+        if not fields:
+            with open(
+                self._csv_path, mode='r', encoding=self.csv_encoding, newline=''
+            ) as csv_file:
+                fields = next(csv.reader([csv_file.readline()]))
 
         for lang, report in reports.items():
-            if not report['data'] or (
-                self.languages_to_exclude and lang in self.languages_to_exclude
-            ):
+            if not report['data'] or lang in self._languages_to_exclude:
                 continue
 
             users = [
@@ -84,12 +139,13 @@ class UpdateCommunityCredits(LocTask):
                     'name': user['user']['fullName'],
                     'translated': user['translated'],
                     'approved': user['approved'],
+                    # Reviews weigh 10x more than translations
+                    'score': user['approved'] * 10 + user['translated']
+                    if user['approved'] > 0
+                    else user['translated'],
                 }
                 for user in report['data']
-                if (
-                    self.users_to_exclude
-                    and user['user']['username'] not in self.users_to_exclude
-                )
+                if user['user']['username'] not in self._users_to_exclude
                 and (
                     user['translated'] > self.translation_threshold
                     or user['approved'] > self.review_threshold
@@ -99,15 +155,9 @@ class UpdateCommunityCredits(LocTask):
             if not users:
                 continue
 
-            users.sort(
-                reverse=True,
-                key=lambda user: user['approved'] * 10 + user['translated']
-                if user['approved'] > 0
-                else user['translated'],
-            )
+            users.sort(reverse=True, key=itemgetter('score'))
 
-            users_string = ''
-            num_users = 0
+            names = []
 
             for u in users:
 
@@ -119,38 +169,38 @@ class UpdateCommunityCredits(LocTask):
                     continue
                 # ----- ----- ----- ----- -----
 
-                if num_users % 4 != 0:
-                    users_string += ', '
-                elif num_users > 0 and num_users % 4 == 0 and num_users < len(users):
-                    users_string += ',\r\n'
-                users_string += re.sub(r'[^\w\d\(\)\-]', '', u['name'])
-                num_users += 1
+                names.append(sanitize_name(u['name']))
+
+            # Four names per line
+            users_string = ',\r\n'.join(
+                ', '.join(names[i : i + 4]) for i in range(0, len(names), 4)
+            )
 
             if not users_string:
                 continue
 
-            logger.info(
-                f'{report["language_name"]} ({report["language_id"]}): {users_string}'
+            logger.opt(lazy=True).debug(
+                '{} ({}): {}',
+                lambda: report['language_name'],
+                lambda: report['language_id'],
+                lambda: users_string,
             )
 
             rows.append(
-                [
+                (
                     report['language_id'],
                     report['language_name'],
                     users_string,
-                ]
+                )
             )
 
-        rows.sort(key=lambda x: x[0])
+        rows.sort(key=itemgetter(0))
+
+        logger.info(f'Credits compiled for languages ({len(rows)}).')
 
         logger.info(f'Saving the reports to: {self._csv_path}')
 
-        with open(
-            self._csv_path, 'w', encoding=self.csv_encoding, newline=''
-        ) as csv_file:
-            csv_writer = csv.writer(csv_file)
-            csv_writer.writerow(fields)
-            csv_writer.writerows(rows)
+        write_csv(self._csv_path, rows, encoding=self.csv_encoding, fields=fields)
 
         return True
 
@@ -175,6 +225,9 @@ def main():
 
     task.read_config(Path(__file__).name, logger)
 
+    if refresh_cache_requested():
+        task.refresh_cache = True
+
     result = task.update_community_credits()
 
     logger.info('--- Update community credits script end ---')
@@ -1,10 +1,16 @@
 import csv
 from dataclasses import dataclass, field
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from loguru import logger
 
-from libraries.utilities import LocTask
-from libraries.crowdin import UECrowdinClient
+from libraries.utilities import (
+    LocTask,
+    atomic_open,
+    cached_json,
+    refresh_cache_requested,
+)
 
 # TODO: Support several localization targets
 
@@ -34,57 +40,87 @@ class UpdateLanguageCompletionRates(LocTask):
 
     csv_encoding: str = 'utf-16-le'
 
+    max_parallel_requests: int = 8  # Targets queried at once
+
+    # Per target, so one stale target doesn't refetch the rest (see cached_json)
+    cache_path: str = 'Localization/~Temp/Cache/completion-rates-{target}.json.gz'
+    cache_ttl_hours: float = 1
+    refresh_cache: bool = False
+
     # TODO: Do I need this here? Or rather in smth from uetools lib?
     content_dir: str = '../'
 
     _csv_path: Path = None
     _content_path: Path = None
+    _cache_path: str = None
+    _cultures_to_skip: frozenset = None
+
+    _crowdin = None
+    _crowdin_lock: Lock = None
 
     def post_update(self):
         super().post_update()
         self._content_path = Path(self.content_dir)
         self._csv_path = self._content_path / self.csv_name
-
-    def get_completion_rates_for_all_targets(self) -> dict:
-        crowdin = UECrowdinClient(
-            self.token, logger, self.organization, self.project_id
+        self._cache_path = str(self._content_path / self.cache_path)
+        self._cultures_to_skip = frozenset(self.cultures_to_skip or ())
+        self._crowdin_lock = Lock()
+
+    def get_crowdin(self):
+        # Created by the first target that misses the cache, shared by the rest
+        with self._crowdin_lock:
+            if self._crowdin is None:
+                from libraries.crowdin import UECrowdinClient
+
+                crowdin = UECrowdinClient(
+                    self.token, logger, self.organization, self.project_id
+                )
+                # Fetch project data once so the threads don't all do it
+                crowdin.update_file_list_and_project_data()
+                self._crowdin = crowdin
+
+        return self._crowdin
+
+    def query_completion_rates(self, target: str) -> dict:
+        return cached_json(
+            self._cache_path.format(target=target),
+            self.cache_ttl_hours,
+            lambda: self.get_crowdin().get_completion_rates(filename=target + '.po'),
+            key=self.project_id,
+            refresh=self.refresh_cache,
+            logger=logger,
         )
 
+    def get_completion_rates_for_all_targets(self) -> dict:
         completion_rates = {}
 
         logger.info(
             f'Targets to query on Crowdin: ({len(self.loc_targets)}): {self.loc_targets}.'
         )
 
-        targets_processed = []
-
-        for target in self.loc_targets:
-            if not completion_rates:
-                completion_rates = crowdin.get_completion_rates(filename=target + '.po')
-
-                if not completion_rates:
-                    logger.warning(
-                        f'No completion rates from Crowdin for target: {target}'
-                    )
-                    continue
-
-                logger.info(
-                    f'Initialized completion rates with data for target: {target}'
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_parallel_requests, len(self.loc_targets)))
+        ) as executor:
+            results = dict(
+                executor.map(
+                    lambda target: (target, self.query_completion_rates(target)),
+                    self.loc_targets,
                 )
-            else:
-                new_rates = crowdin.get_completion_rates(filename=target + '.po')
+            )
 
-                if not new_rates:
-                    logger.warning(
-                        f'No completion rates from Crowdin for target: {target}'
-                    )
-                    continue
+        targets_processed = []
 
-                for lang, data in completion_rates.items():
-                    for key in data:
-                        completion_rates[lang][key] += new_rates[lang][key]
+        for target, new_rates in results.items():
+            if not new_rates:
+                logger.warning(f'No completion rates from Crowdin for target: {target}')
+                continue
+
+            for lang, data in new_rates.items():
+                rates = completion_rates.setdefault(lang, dict.fromkeys(data, 0))
+                for key, value in data.items():
+                    rates[key] = rates.get(key, 0) + value
 
-            targets_processed += [target]
+            targets_processed.append(target)
 
         # All good, received completion rates for all targets
         if targets_processed and len(targets_processed) == len(self.loc_targets):
@@ -93,14 +129,14 @@ class UpdateLanguageCompletionRates(LocTask):
                 f'{targets_processed}.'
             )
             if len(targets_processed) > 1:
-                for lang, data in completion_rates.items():
-                    completion_rates[lang]['translationProgress'] = round(
-                        completion_rates[lang]['translated']
-                        / completion_rates[lang]['total']
+                # Recalculate percentages from the summed word counts
+                for data in completion_rates.values():
+                    total = data['total']
+                    data['translationProgress'] = (
+                        100 * data['translated'] // total if total else 0
                     )
-                    completion_rates[lang]['approvalProgress'] = round(
-                        completion_rates[lang]['approved']
-                        / completion_rates[lang]['total']
+                    data['approvalProgress'] = (
+                        100 * data['approved'] // total if total else 0
                     )
 
             return completion_rates
@@ -131,18 +167,9 @@ class UpdateLanguageCompletionRates(LocTask):
         by getting translated percetanges from POs it respective locale folders
         """
 
-        fields = []
-        rows = []
-        with open(
-            self._csv_path, mode='r', encoding=self.csv_encoding, newline=''
-        ) as csv_file:
-            csv_reader = csv.reader(csv_file)
-            fields = next(csv_reader)
-            for row in csv_reader:
-                rows.append(row)
-
         locales_processed = 0
         locales_skipped = 0
+        num_rows = 0
 
         completion_rates = self.get_completion_rates_for_all_targets()
 
@@ -154,38 +181,50 @@ class UpdateLanguageCompletionRates(LocTask):
             logger.error(f'No completion rates recieved from Crowdin. Aborting!')
             return False
 
-        for row in rows:
-            # Skip the native and test cultures (100% anyway)
-            if row[0] in self.cultures_to_skip:
-                logger.info(
-                    f'{row[0]} skipped because it\'s in the locales to skip list.'
-                )
-                locales_skipped += 1
-                continue
+        # Rewrite the CSV row by row into a temp file, then swap it in
+        # (the source is closed first, Windows can't replace an open file)
+        with atomic_open(
+            self._csv_path,
+            encoding=self.csv_encoding,
+            newline='',
+            buffering=1 << 20,
+        ) as tmp_file, open(
+            self._csv_path,
+            mode='r',
+            encoding=self.csv_encoding,
+            newline='',
+            buffering=1 << 20,
+        ) as csv_file:
+            csv_reader = csv.reader(csv_file)
+            csv_writer = csv.writer(tmp_file)
+            csv_writer.writerow(next(csv_reader))
 
-            if row[0] in completion_rates:
-                logger.info(
-                    f'{row[0]} updated from {row[4]} to {completion_rates[row[0]]["translationProgress"]} '
-                    '(Crowdin data).'
-                )
-                row[4] = completion_rates[row[0]]['translationProgress']
-                locales_processed += 1
-            else:
-                if completion_rates:
+            for row in csv_reader:
+                num_rows += 1
+
+                # Skip the native and test cultures (100% anyway)
+                if row[0] in self._cultures_to_skip:
+                    logger.info(
+                        f'{row[0]} skipped because it\'s in the locales to skip list.'
+                    )
+                    locales_skipped += 1
+                elif row[0] in completion_rates:
+                    logger.info(
+                        f'{row[0]} updated from {row[4]} to {completion_rates[row[0]]["translationProgress"]} '
+                        '(Crowdin data).'
+                    )
+                    row[4] = completion_rates[row[0]]['translationProgress']
+                    locales_processed += 1
+                else:
                     logger.warning(
                         f'{row[0]} missing from language mappings. Not updated.'
                     )
 
-        with open(
-            self._csv_path, 'w', encoding=self.csv_encoding, newline=''
-        ) as csv_file:
-            csv_writer = csv.writer(csv_file)
-            csv_writer.writerow(fields)
-            csv_writer.writerows(rows)
+                csv_writer.writerow(row)
 
         if locales_processed:
             logger.info(
-                f'Processed locales: {locales_processed} / {len(rows)}. Locales skipped: {locales_skipped}.'
+                f'Processed locales: {locales_processed} / {num_rows}. Locales skipped: {locales_skipped}.'
             )
             return True
 
@@ -214,6 +253,9 @@ def main():
 
     task.read_config(Path(__file__).name, logger)
 
+    if refresh_cache_requested():
+        task.refresh_cache = True
+
     result = task.update_completion_rates()
 
     logger.info('')
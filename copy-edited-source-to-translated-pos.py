@@ -1,5 +1,7 @@
+import os
 import polib
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from loguru import logger
 
 path = Path(__file__).parent
@@ -7,51 +9,79 @@ encoding = 'utf-8-sig'
 targets = ['Game']
 src_loc = 'en'
 
-logger.add(
-    'logs/locsync.log',
-    rotation='10MB',
-    retention='1 month',
-    enqueue=True,
-    format='{time:YYYY-MM-DD at HH:mm:ss} | {level} | {message}',
-    level='INFO',
-    encoding='utf-8',
-)
-
-logger.info(f'Targets top  found ({len(targets)}): {targets}')
-logger.info(f'------------------------------------')
-
-
-for target in targets:
-    src_path = ((path / target) / src_loc) / f'{target}.po'
-    src_po = polib.pofile(src_path, wrapwidth=0, encoding=encoding)
-    src_entries = len(src_po)
-    logger.info(f'Source PO: {src_path}')
-    logger.info(f'Entries in source PO: {src_entries}')
-
-    directories = [
-        f for f in (path / target).glob('*') if f.is_dir() and not f.name == src_loc
-    ]
-    logger.info(f'Directories found ({len(directories)}): {directories}')
-    logger.info(f'------------------------------------')
 
-    processed = []
-    for dir in directories:
-        po_path = dir / f'{target}.po'
-        po = polib.pofile(po_path, wrapwidth=0, encoding=encoding)
-        logger.info(f'Processing target PO: {po_path}')
-        logger.info(f'Entries in translated PO: {len(po)}')
-        not_found = []
-        changed_sources = []
-        for entry in po:
-            for src_entry in src_po:
-                if src_entry.msgctxt == entry.msgctxt:
-                    if not entry.msgid == src_entry.msgstr:
-                        entry.msgid = src_entry.msgstr
-                        changed_sources += [entry.msgctxt]
-                    break
-            else:
-                not_found += [entry.msgctxt]
-        logger.info(f'Updated ({len(changed_sources)}): {changed_sources}')
-        logger.warning(f'Not found ({len(not_found)}): {not_found}')
-        logger.info(f'------------------------------------\n')
+def process_locale(po_path: Path, src_map: dict, encoding: str) -> tuple:
+    # Runs in a worker process: return the results and log them in the main one
+    po = polib.pofile(po_path, wrapwidth=0, encoding=encoding)
+    not_found = []
+    changed_sources = []
+    for entry in po:
+        src = src_map.get(entry.msgctxt)
+        if src is None:
+            not_found.append(entry.msgctxt)
+        elif entry.msgid != src:
+            entry.msgid = src
+            changed_sources.append(entry.msgctxt)
+    if changed_sources:
         po.save()
+
+    return po_path, len(po), changed_sources, not_found
+
+
+def main():
+    logger.add(
+        'logs/locsync.log',
+        rotation='10MB',
+        retention='1 month',
+        enqueue=True,
+        format='{time:YYYY-MM-DD at HH:mm:ss} | {level} | {message}',
+        level='INFO',
+        encoding='utf-8',
+    )
+
+    logger.info(f'Targets top  found ({len(targets)}): {targets}')
+    logger.info(f'------------------------------------')
+
+    for target in targets:
+        src_path = ((path / target) / src_loc) / f'{target}.po'
+        src_po = polib.pofile(src_path, wrapwidth=0, encoding=encoding)
+        src_entries = len(src_po)
+        # Reversed so the first entry wins for duplicate contexts
+        src_map = {e.msgctxt: e.msgstr for e in reversed(src_po)}
+        logger.info(f'Source PO: {src_path}')
+        logger.info(f'Entries in source PO: {src_entries}')
+
+        with os.scandir(path / target) as entries:
+            directories = [
+                Path(e.path) for e in entries if e.is_dir() and e.name != src_loc
+            ]
+        logger.info(f'Directories found ({len(directories)}): {directories}')
+        logger.info(f'------------------------------------')
+
+        if not directories:
+            continue
+
+        # Parsing POs is CPU-bound, so fan out locales to processes, not threads
+        with ProcessPoolExecutor(
+            max_workers=min(len(directories), os.cpu_count() or 1)
+        ) as executor:
+            futures = [
+                executor.submit(process_locale, dir / f'{target}.po', src_map, encoding)
+                for dir in directories
+            ]
+            for future in as_completed(futures):
+                po_path, entries, changed_sources, not_found = future.result()
+                logger.info(f'Processed target PO: {po_path}')
+                logger.info(f'Entries in translated PO: {entries}')
+                if changed_sources:
+                    logger.info(f'Updated ({len(changed_sources)}): {changed_sources}')
+                else:
+                    logger.info('No changes, skipped saving.')
+                logger.warning(f'Not found ({len(not_found)}): {not_found}')
+                logger.info(f'------------------------------------\n')
+
+
+# Run the script if it isn't imported
+# (also keeps worker processes from re-running it)
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from dataclasses import dataclass
 from loguru import logger
 import re
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 from libraries.crowdin import UECrowdinClient
 from libraries.utilities import LocTask
 from libraries import polib
 
+DRIVE_LINK_PREFIX = 'https://drive.google.com/file/d/'
+DRIVE_LINK_REGEX = '(https://drive.google.com/file/d/([^/]+)/view)'
+FILENAME_REGEX = re.compile('filename=(.+)')
+IMAGE_EXTENSIONS = frozenset(('.png', '.jpg', '.jpeg', '.webp', '.gif', '.bmp'))
+
 @dataclass
 class ImportScreenshots(LocTask):
 
@@ -26,67 +34,146 @@ class ImportScreenshots(LocTask):
     # Group 0 will be used as link
     # Group 1 will be used as filename on Crowdin
     # and as {name} to create a download link if dl_link is set
-    link_regex: str = '(https://drive.google.com/file/d/([^/]+)/view)'
+    link_regex: str = DRIVE_LINK_REGEX
+
+    # Use plain string splitting instead of the regex for default Drive links
+    fast_link_parsing: bool = True
 
     # If set, it will be formatted with {name} and used to download the file
     dl_link: str = 'https://drive.google.com/uc?id={name}&export=download'
 
     def_ext: str = '.png'
+
+    # Google Drive doesn't like too many downloads at once
+    max_parallel_downloads: int = 8
+    download_timeout: float = 30  # Seconds to wait for Google Drive to respond
+    # Crowdin uploads, tagging and list requests in flight at once
+    max_parallel_requests: int = 8
    
     # TODO: Do I need this here? Or rather in smth from uetools lib?
     content_dir: str = '../'
     temp_dir: str = 'Localization/~Temp/Screenshots'
 
     _content_path: Path = None
-    _temp_path: Path = None    
+    _temp_path: Path = None
+    _link_regex: re.Pattern = None
+    _fast_drive_links: bool = False
+    _screens_on_crowdin_cache: dict = None
+    _links_in_strings_cache: dict = None
+    _session: Session = None
 
     def post_update(self):
         super().post_update()
         self._content_path = Path(self.content_dir).resolve()
         self._temp_path = Path(self._content_path / self.temp_dir)
+        self._link_regex = re.compile(self.link_regex)
+        self._fast_drive_links = (
+            self.fast_link_parsing and self.link_regex == DRIVE_LINK_REGEX
+        )
         self._crowdin = UECrowdinClient(
             self.token, logger, self.organization, self.project_id
         )
+        # Keep-alive session for screenshot downloads, separate from Crowdin's
+        self._session = Session()
+        self._session.mount(
+            'https://',
+            HTTPAdapter(
+                pool_maxsize=max(1, self.max_parallel_downloads),
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    raise_on_status=False,
+                ),
+            ),
+        )
+        self._screens_on_crowdin_cache = None
+        self._links_in_strings_cache = None
+
+    def _get_links_cached(self) -> dict[str: dict]:
+        '''
+        Returns the screenshot links from strings on Crowdin, fetching them
+        only once per run (the import doesn't change the strings)
+        '''
+        if self._links_in_strings_cache is None:
+            self._links_in_strings_cache = (
+                self.get_screens_links_and_string_ids_from_crowdin_strings()
+            )
+        return self._links_in_strings_cache
+
+    def _get_screens_cached(self) -> dict[str: dict]:
+        '''
+        Returns the screenshots on Crowdin, fetching them only once per run
+        (or after the cache is invalidated by adding or tagging screenshots)
+        '''
+        if self._screens_on_crowdin_cache is None:
+            self._screens_on_crowdin_cache = self.get_screens_names_and_ids_from_crowdin()
+        return self._screens_on_crowdin_cache
+
+    def _invalidate_screens_cache(self):
+        self._screens_on_crowdin_cache = None
 
     def get_screens_names_and_ids_from_crowdin(self) -> dict[str: dict]:
-        resp = self._crowdin.screenshots.with_fetch_all().list_screenshots(self.project_id)        
-        
-        if 'data' not in resp:
-            logger.error(f'Error, no data in response. Response:\n{resp}')
-            return None
-        
         screens_on_crowdin = {}
-        for screen in resp['data']:
-            (name, _, ext) = screen['data']['name'].rpartition('.')
-            if not name:
-                name = ext
-            screens_on_crowdin[name] = {
-                'id': screen['data']['id'],
-                'tags': [tag['stringId'] for tag in screen['data']['tags']]
-            }
+        # Process the screenshots page by page instead of collecting them all first
+        for page in self._crowdin.iter_pages(
+            self._crowdin.screenshots.list_screenshots,
+            self.project_id,
+            max_workers=self.max_parallel_requests,
+        ):
+            if 'data' not in page:
+                logger.error(f'Error, no data in response. Response:\n{page}')
+                return None
+
+            for screen in page['data']:
+                (name, _, ext) = screen['data']['name'].rpartition('.')
+                if not name:
+                    name = ext
+                screens_on_crowdin[name] = {
+                    'id': screen['data']['id'],
+                    'tags': frozenset(tag['stringId'] for tag in screen['data']['tags'])
+                }
 
         return screens_on_crowdin
 
+    def find_links(self, context: str) -> list[tuple[str, str]]:
+        '''
+        Returns (link, name) pairs found in the context
+        (groups 1 and 2 of each link regex match).
+        '''
+        if not self._fast_drive_links:
+            return [m.group(1, 2) for m in self._link_regex.finditer(context)]
+
+        links = []
+        for part in context.split(DRIVE_LINK_PREFIX)[1:]:
+            name, sep, _ = part.partition('/view')
+            if sep and name and '/' not in name:
+                links.append((f'{DRIVE_LINK_PREFIX}{name}/view', name))
+
+        return links
+
     def get_screens_links_and_string_ids_from_crowdin_strings(
             self
-    ) -> dict[str: list[int]]:
-        resp = self._crowdin.source_strings.with_fetch_all().list_strings(
+    ) -> dict[str: dict]:
+        # Keep the name extracted with the link so we never have to match it again
+        screens_linked_in_strings = {}
+        # Process the strings page by page instead of collecting them all first
+        for page in self._crowdin.iter_pages(
+            self._crowdin.source_strings.list_strings,
             self.project_id,
-            croql=f'context contains "{self.link_croql_filter}"'
-        )
+            max_workers=self.max_parallel_requests,
+            croql=f'context contains "{self.link_croql_filter}"',
+        ):
+            if 'data' not in page:
+                logger.error(f'Error, no data in response. Response:\n{page}')
+                return None
+
+            for string in page['data']:
+                for link, name in self.find_links(string['data']['context']):
+                    screens_linked_in_strings.setdefault(
+                        link, {'name': name, 'string_ids': []}
+                    )['string_ids'].append(string['data']['id'])
 
-        if 'data' not in resp:
-            logger.error(f'Error, no data in response. Response:\n{resp}')
-            return None
-        
-        screens_linked_in_strings = {}
-        for string in resp['data']:
-            links = re.findall(self.link_regex, string['data']['context'])
-            for link in links:
-                if link[0] not in screens_linked_in_strings:
-                    screens_linked_in_strings[link[0]] = []
-                screens_linked_in_strings[link[0]].append(string['data']['id'])
-        
         return screens_linked_in_strings
     
     def get_screenshots_to_download(
@@ -94,19 +181,18 @@ class ImportScreenshots(LocTask):
             screens_linked_in_strings: dict,
             screens_on_crowdin: dict,
     ) -> dict[str: str]:
-        if not screens_linked_in_strings:
-            screens_linked_in_strings = self.get_screens_links_and_string_ids_from_crowdin_strings()
+        if screens_linked_in_strings is None:
+            screens_linked_in_strings = self._get_links_cached()
 
-        if not screens_on_crowdin:
-            screens_on_crowdin = self.get_screens_names_and_ids_from_crowdin()
+        if screens_on_crowdin is None:
+            screens_on_crowdin = self._get_screens_cached()
         
-        links = {}
-        for link in screens_linked_in_strings.keys():
-            id = re.search(self.link_regex, link)[2]
-            if id not in screens_on_crowdin.keys():
-                links[id] = link
-    
-        return links
+        links = {
+            screen['name']: link for link, screen in screens_linked_in_strings.items()
+        }
+        missing = links.keys() - screens_on_crowdin.keys()
+
+        return {name: links[name] for name in missing}
 
     def download_screenshot(
             self,
@@ -117,52 +203,111 @@ class ImportScreenshots(LocTask):
         if not path:
             path = self._temp_path
 
+        link_name = self._link_regex.search(url)[2]
+        _name = name or link_name
+
         if not name:
-            _name = re.search(self.link_regex, url)[2]
             if (path / f'{_name}{self.def_ext}').exists():
                 logger.info(f'Found the file, skipping download: { path / (_name + self.def_ext)}')
                 return path / f'{_name}{self.def_ext}'
 
         _url = url
         if self.dl_link is not None:
-            _url = self.dl_link.format(name=re.search(self.link_regex, url)[2])
+            _url = self.dl_link.format(name=link_name)
 
         logger.info(f'Trying to download the file: {_url}')
-        r = requests.get(_url, allow_redirects=True)
+        with self._session.get(
+            _url, allow_redirects=True, stream=True, timeout=self.download_timeout
+        ) as r:
+            if r.status_code == 403:
+                logger.error('Response 403, Google hates me :( Use VPN to download more screens.')
+            r.raise_for_status()
 
-        if r.status_code == 403:
-            logger.error('Response 403, Google hates me :( Use VPN to download more screens.')
-            raise
+            suffix: str = ''
 
-        suffix: str = ''
+            cd = r.headers.get('content-disposition', None)
+            if cd:
+                fname = FILENAME_REGEX.findall(cd)
+                if len(fname) > 0:
+                    suffix = Path(fname[0]).suffix
 
-        cd = r.headers.get('content-disposition', None)
-        if cd:
-            fname = re.findall('filename=(.+)', cd)
-            if len(fname) > 0:
-                suffix = Path(fname[0]).suffix
-        
-        if not suffix:
-            logger.warning(f'No filename in headers. Assuming the screenshots is {self.def_ext}...')
-            suffix = self.def_ext
-        
-        file_path = path / f'{_name}{suffix}'
+            if not suffix:
+                logger.warning(f'No filename in headers. Assuming the screenshots is {self.def_ext}...')
+                suffix = self.def_ext
+
+            file_path = path / f'{_name}{suffix}'
 
-        logger.info(f'Saving: {file_path}')
+            logger.info(f'Saving: {file_path}')
 
-        open(file_path, 'wb').write(r.content)
+            # Chunks are already large, so skip the buffered IO layer, and write
+            # to a temp file so an interrupted download isn't taken for a screenshot
+            part_path = file_path.with_name(file_path.name + '.part')
+            with open(part_path, 'wb', buffering=0) as f:
+                for chunk in r.iter_content(64 * 1024):
+                    f.write(chunk)
+            os.replace(part_path, file_path)
 
         return file_path
     
-    def download_screenshots(self, urls: list[str], path: Path = None) -> list[Path]:
-        processed_screens = []
-        for url in urls:
-            processed_screens.append(self.download_screenshot(url=url, path=path))            
+    def download_screenshots(
+            self,
+            urls: dict[str: str] or list[str],
+            path: Path = None,
+            on_downloaded=None,
+    ) -> list[Path]:
+        '''
+        Downloads screenshots from a {name: url} dict or a list of urls.
+        Screenshots already in the folder are picked up without any requests.
+        If set, on_downloaded is called with the path of each screenshot
+        as soon as it's ready.
+        '''
+        if isinstance(urls, dict):
+            screens = urls
+        else:
+            screens = {self._link_regex.search(url)[2]: url for url in urls}
+
+        dir_path = path or self._temp_path
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+        # Scan the folder once instead of checking each file
+        with os.scandir(dir_path) as entries:
+            existing = {}
+            for e in entries:
+                stem, _, ext = e.name.rpartition('.')
+                if stem and f'.{ext.lower()}' in IMAGE_EXTENSIONS and e.is_file():
+                    existing[stem] = Path(e.path)
+
+        processed_screens = [existing[n] for n in screens if n in existing]
+        to_fetch = {n: url for n, url in screens.items() if n not in existing}
+        if processed_screens:
+            logger.info(
+                f'Found {len(processed_screens)} screenshots, skipping their download.'
+            )
+            if on_downloaded:
+                for file_path in processed_screens:
+                    on_downloaded(file_path)
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_parallel_downloads, len(to_fetch)))
+        ) as executor:
+            futures = {
+                executor.submit(self.download_screenshot, url=url, path=path): url
+                for url in to_fetch.values()
+            }
+            for future in as_completed(futures):
+                try:
+                    file_path = future.result()
+                except Exception as err:
+                    logger.error(f'Failed to download {futures[future]}: {err}')
+                    continue
+                processed_screens.append(file_path)
+                if on_downloaded:
+                    on_downloaded(file_path)
 
-        if len(processed_screens) == len(urls):
-            logger.info(f'All good, uploaded {len(urls)} screenshots!')
+        if len(processed_screens) == len(screens):
+            logger.info(f'All good, downloaded {len(screens)} screenshots!')
         else:
-            logger.error(f'Uploaded only {len(processed_screens)}/{len(urls)} screenshots:\n'
+            logger.error(f'Downloaded only {len(processed_screens)}/{len(screens)} screenshots:\n'
                          f'{processed_screens}')
         
         return processed_screens
@@ -174,7 +319,7 @@ class ImportScreenshots(LocTask):
             name: str = None
     ) -> dict[str: int]:
         with open(path, mode='rb') as file:
-            storage = self._crowdin.storages.add_storage(file)
+            storage = self._crowdin.add_storage(file)
 
         if 'data' not in storage or 'id' not in storage['data']:
             logger.error(f'Error, no storage ID recieved. Response:\n{storage}')
@@ -185,7 +330,8 @@ class ImportScreenshots(LocTask):
         if name is None:
             name = Path(path).name
 
-        response = self._crowdin.screenshots.add_screenshot(
+        response = self._crowdin.call(
+            self._crowdin.screenshots.add_screenshot,
             projectId=self.project_id,
             storageId=storage['data']['id'],
             name=name,
@@ -199,9 +345,11 @@ class ImportScreenshots(LocTask):
         return {name: response['data']['id']}
     
     def add_screenshots_to_crowdin(self, paths: list[Path]) -> list[dict]:
-        processed_screens = []
-        for path in paths:
-            processed_screens.append(self.add_screenshot_to_crowdin(path=path))
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_parallel_requests, len(paths)))
+        ) as executor:
+            processed_screens = list(executor.map(self.add_screenshot_to_crowdin, paths))
+
         if len(processed_screens) == len(paths):
             logger.info(f'All good, uploaded {len(paths)} screenshots!')
         else:
@@ -212,59 +360,79 @@ class ImportScreenshots(LocTask):
     
     def get_strings_to_tag(
             self, 
-            screens_linked_in_strings: dict[str: list[int]] = None,
+            screens_linked_in_strings: dict[str: dict] = None,
             screens_on_crowdin: dict[str:dict] = None,
     ) -> dict[str: str]:
-        if not screens_linked_in_strings:
-            screens_linked_in_strings = self.get_screens_links_and_string_ids_from_crowdin_strings()
+        if screens_linked_in_strings is None:
+            screens_linked_in_strings = self._get_links_cached()
 
-        if not screens_on_crowdin:
-            screens_on_crowdin = self.get_screens_names_and_ids_from_crowdin()
+        if screens_on_crowdin is None:
+            screens_on_crowdin = self._get_screens_cached()
         
         tags = []
-        for link, string_ids in screens_linked_in_strings.items():
-            id = re.search(self.link_regex, link)[2]
-            if id not in screens_on_crowdin.keys():
+        for screen in screens_linked_in_strings.values():
+            id = screen['name']
+            if id not in screens_on_crowdin:
                 logger.warning(f'Missing screenshot on Crowdin: {id}. Please upload missing screens, then tag.')
+                continue
 
-            for string_id in string_ids:
-                if string_id in screens_on_crowdin[id]['tags']:
-                    continue
-                tags.append((screens_on_crowdin[id]['id'], string_id))
+            screen_id = screens_on_crowdin[id]['id']
+            tagged = screens_on_crowdin[id]['tags']
+            tags.extend(
+                (screen_id, string_id)
+                for string_id in screen['string_ids']
+                if string_id not in tagged
+            )
 
         return tags
     
-    def tag_string(self, screen_id: int, string_id: int) -> bool:
-        logger.info(f'Tagging string {string_id} on screenshot {screen_id}...')
-        tags = self._crowdin.screenshots.list_tags(self.project_id, screen_id)
-        if not 'data' in tags:
-            logger.error(f'No data in response for screenshot {screen_id}')
-            return None
-        
-        if string_id in [tag['data']['stringId'] for tag in tags['data']]:
-            logger.info(f'String {string_id} already tagged on screenshot {screen_id}.')
-            return True
-        
-        response = self._crowdin.screenshots.add_tag(self.project_id, screen_id, [{'stringId': string_id}])
+    def tag_screenshot(self, screen_id: int, string_ids: list[int]) -> bool:
+        # Already tagged strings are filtered out in get_strings_to_tag
+        # using the tags from the list of screenshots, no need to check again
+        logger.info(f'Tagging {len(string_ids)} strings on screenshot {screen_id}...')
+        response = self._crowdin.call(
+            self._crowdin.screenshots.add_tag,
+            self.project_id,
+            screen_id,
+            [{'stringId': id} for id in string_ids],
+        )
         if 'data' in response:
             return True
         else:
             logger.error(f'No data in response:\n{response}')
             return None
-    
+
+    def tag_string(self, screen_id: int, string_id: int) -> bool:
+        return self.tag_screenshot(screen_id, [string_id])
+
     def tag_strings(self, tags: list[tuple]) -> list[tuple]:
-        processed_tags = []
-        for tag in tags:
-            tag = self.tag_string(tag[0], tag[1])
-            if tag is not None:
-                processed_tags.append(tag)
+        # One request per screenshot with all of its strings
+        string_ids_by_screen = {}
+        for screen_id, string_id in tags:
+            string_ids_by_screen.setdefault(screen_id, []).append(string_id)
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_parallel_requests, len(string_ids_by_screen)))
+        ) as executor:
+            results = executor.map(
+                lambda item: self.tag_screenshot(*item), string_ids_by_screen.items()
+            )
+            processed_tags = [
+                (screen_id, string_id)
+                for (screen_id, string_ids), result in zip(
+                    string_ids_by_screen.items(), results
+                )
+                if result is not None
+                for string_id in string_ids
+            ]
 
         if len(processed_tags) == len(tags):
             logger.info(f'All good, tagged {len(tags)} strings!')
         else:
+            processed = set(processed_tags)
             logger.error(f'Tagged only {len(processed_tags)}/{len(tags)} '
                          f'screenshots:\n{processed_tags}'
-                         f'Failed to process:\n{[tag for tag in tags if tag not in processed_tags]}')
+                         f'Failed to process:\n{[tag for tag in tags if tag not in processed]}')
         
         return processed_tags
 
@@ -272,19 +440,32 @@ class ImportScreenshots(LocTask):
         strings_processed = []
 
         logger.info('Downloading links from strings on Crowdin...')
-        links_in_strings = self.get_screens_links_and_string_ids_from_crowdin_strings()
+        links_in_strings = self._get_links_cached()
         logger.info(f'Links from strings on Crowdin: {len(links_in_strings)}')
 
         logger.info('Downloading list of screenshots on Crowdin...')
-        screens_on_crowdin = self.get_screens_names_and_ids_from_crowdin()
+        screens_on_crowdin = self._get_screens_cached()
         logger.info(f'Screenshots already on Crowdin: {len(screens_on_crowdin)}')
         
         logger.info('Making a list of screenshots to dowlnoad via links and upload to Crowdin...')
         screens_to_add = self.get_screenshots_to_download(links_in_strings, screens_on_crowdin)
         logger.info(f'Screenshots to download and upload: {len(screens_to_add)}')
 
-        logger.info('Downloading screenshots...')
-        paths = self.download_screenshots(screens_to_add.values())
+        logger.info('Downloading screenshots and uploading them to Crowdin...')
+        # Upload each screenshot as soon as it's downloaded
+        # instead of waiting for all downloads to finish
+        with ThreadPoolExecutor(
+            max_workers=max(1, self.max_parallel_requests)
+        ) as uploader:
+            uploads = []
+            paths = self.download_screenshots(
+                screens_to_add,
+                on_downloaded=lambda path: uploads.append(
+                    uploader.submit(self.add_screenshot_to_crowdin, path)
+                ),
+            )
+            added_screens = [upload.result() for upload in uploads]
+
         if len(paths) != len(screens_to_add):
             logger.error(f'Not all screenshots have been downloaded. Downloaded screenshots:\n'
                          f'{paths}\n'
@@ -293,21 +474,22 @@ class ImportScreenshots(LocTask):
         else:
             logger.info(f'Downloaded screenshots: {len(paths)}')
 
-        logger.info('Uploading screenshots to Crowdin...')
-        added_screens = self.add_screenshots_to_crowdin(paths)
         if len(added_screens) != len(paths):
             logger.error(f'Not all screenshots have been uploaded. Uploaded screenshots:\n'
                          f'{added_screens}\n'
                          f'Screenshots to upload:\n'
                          f'{paths}\n')
         else:
-            logger.info(f'Downloaded screenshots: {len(added_screens)}')
+            logger.info(f'Uploaded screenshots: {len(added_screens)}')
         
         if len(added_screens) > 0:
             logger.info('Dwonloading updated list of screenshots on Crowdin...')
-            screens_on_crowdin = self.get_screens_names_and_ids_from_crowdin()
+            self._invalidate_screens_cache()
+            screens_on_crowdin = self._get_screens_cached()
 
-        missing_screens = [s for s in added_screens if s.keys()[0] not in screens_on_crowdin.keys()]
+        # Screenshots on Crowdin are listed by name without the extension
+        added_names = {Path(next(iter(s))).stem for s in added_screens if s}
+        missing_screens = added_names - screens_on_crowdin.keys()
 
         if missing_screens:
             logger.error(f'Not all screenshots are uploaded. Missing screenshots:\n'
@@ -322,7 +504,9 @@ class ImportScreenshots(LocTask):
         logger.info('Tagging strings...')
         tagged_strings = self.tag_strings(strings_to_tag)
         if not len(tagged_strings) == len(strings_to_tag):
-            strings_to_tag = self.get_strings_to_tag()
+            # Tags have changed, so the check needs a fresh list of screenshots
+            self._invalidate_screens_cache()
+            strings_to_tag = self.get_strings_to_tag(links_in_strings)
             logger.warning(f'Not all strings have been tagged, missing {len(strings_to_tag)}')
 
         return True
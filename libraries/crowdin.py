@@ -1,12 +1,107 @@
 from crowdin_api import CrowdinClient
-from time import sleep, time
-import urllib.request
-import json
+from requests import Session
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from concurrent.futures import ThreadPoolExecutor
+from random import uniform
+from statistics import median
+from threading import Lock
+from time import monotonic, sleep, time
 import re
+import sys
+import hashlib
 from pathlib import Path
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from libraries.utilities import read_json_cache, write_json_cache
+
+# Responses worth retrying: throttling and server errors
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+RATE_LIMIT_REGEX = re.compile('rate limit|quota|too many requests', re.IGNORECASE)
+# Language names in reports, e.g., 'French, Canada' -> 'French (Canada)'
+NON_WORD_REGEX = re.compile(r'[^\w]')
+LANGUAGE_REGION_REGEX = re.compile(r', (.*)$')
+# The HTTP layer reads uploads in small blocks, so buffer them in larger reads
+UPLOAD_BUFFER_SIZE = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    with open(path, mode='rb') as file:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(file, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: file.read(UPLOAD_BUFFER_SIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def retry_after_seconds(value: str) -> float or None:
+    '''
+    Returns the wait in seconds from a Retry-After header, given either
+    as seconds or as an HTTP date. Returns None if it can't be parsed.
+    '''
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class _TokenBucket:
+    '''
+    Thread-safe token bucket: acquire() blocks until a token is available.
+    Refills rate tokens per second, up to capacity.
+    '''
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            sleep(wait)
+
+
+# Shared by all clients in the process: Crowdin limits requests per account.
+# Taken by _retry, so it covers every call routed through _retry or call
+_crowdin_rate_limiter = _TokenBucket(rate=20, capacity=20)
 
 
 class UECrowdinClient(CrowdinClient):
+    # Retries for Crowdin API calls, see _retry
+    max_retries = 3
+    retry_backoff = 1.0
+    max_retry_wait = 60.0
+    # Seconds to reuse the file list and project data for
+    project_data_ttl = 300
+    # Files are only uploaded again if their content or Crowdin revision changed
+    # (set the TTL to 0 to always upload). update-source-files moves the cache
+    # under Localization/~Temp in the project, see its config
+    uploaded_files_cache_path = '.cache/crowdin/uploaded-files.json'
+    uploaded_files_cache_ttl_hours = 24 * 30
+
     def __init__(
         self,
         token: str,
@@ -36,47 +131,198 @@ class UECrowdinClient(CrowdinClient):
 
         self.file_list = None
         self.data = dict()
+        # File IDs by name and when the file list and project data were fetched
+        self._file_ids = {}
+        self._project_data_time = None
+        # Directory IDs by name, fetched on first use
+        self._dir_ids = None
+        # Hashes of uploaded files, to skip uploading them again if unchanged
+        self._uploaded_files = None
+        self._uploaded_files_lock = Lock()
+        # Seconds it took Crowdin to generate reports, to time status checks
+        self._report_ready_samples = []
+
+        # Shared keep-alive session for non-API downloads (builds, reports, etc.)
+        # API calls go through the requester session of the Crowdin client
+        self.session = Session()
+        self.session.mount(
+            'https://',
+            HTTPAdapter(
+                pool_connections=8,
+                pool_maxsize=16,
+                max_retries=Retry(
+                    total=5,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                ),
+            ),
+        )
 
         super().__init__()
 
-    def info(self, message: str, *args, **kwargs):
+    # Without a logger, messages go to stderr. Same as with loguru,
+    # {} in the message are only formatted with args when it's printed,
+    # so pass big payloads as args instead of formatting them in advance
+    def _print(self, level: str, message: str, *args, **kwargs):
         if self.silent:
             return
-        print('I | ', message, args, kwargs)
+        if args or kwargs:
+            message = message.format(*args, **kwargs)
+        print(level, message, file=sys.stderr)
+
+    def info(self, message: str, *args, **kwargs):
+        self._print('I | ', message, *args, **kwargs)
 
     def warning(self, message: str, *args, **kwargs):
-        if self.silent:
-            return
-        print('W | ', message, args, kwargs)
+        self._print('W | ', message, *args, **kwargs)
 
     def error(self, message: str, *args, **kwargs):
-        if self.silent:
+        self._print('E | ', message, *args, **kwargs)
+
+    def _retry(self, fn, *args, **kwargs):
+        '''
+        Calls fn, retrying up to max_retries times with exponential backoff
+        when Crowdin throttles the request or fails with a server error.
+        Honors the Retry-After header when there is one.
+        Every attempt waits for the shared rate limiter first. Only calls
+        made through _retry or call are limited, not direct API client calls.
+        '''
+        for attempt in range(self.max_retries + 1):
+            _crowdin_rate_limiter.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as err:
+                response = getattr(err, 'response', None)
+                status = getattr(err, 'http_status', None) or getattr(
+                    response, 'status_code', None
+                )
+                retriable = status in RETRY_STATUSES or isinstance(
+                    err, (RequestsConnectionError, Timeout)
+                )
+                if not retriable and RATE_LIMIT_REGEX.search(str(err)):
+                    retriable = True
+                if not retriable or attempt == self.max_retries:
+                    raise
+
+                delay = self.retry_backoff * 2**attempt + uniform(0, 1)
+                # crowdin_api exceptions carry the headers themselves,
+                # requests exceptions have them on the response
+                headers = (
+                    getattr(err, 'headers', None)
+                    or getattr(response, 'headers', None)
+                    or {}
+                )
+                retry_after = headers.get('Retry-After') or headers.get('retry-after')
+                if retry_after:
+                    wait = retry_after_seconds(retry_after)
+                    if wait is None:
+                        self.warning(f'Ignoring unparsable Retry-After: {retry_after}')
+                    else:
+                        delay = wait
+                delay = min(delay, self.max_retry_wait)
+
+                self.warning(
+                    f'Crowdin request failed ({status or type(err).__name__}), '
+                    f'retrying in {delay:.1f} s...'
+                )
+                sleep(delay)
+
+    def call(self, fn, *args, **kwargs):
+        '''
+        Calls a Crowdin API method (e.g. self.screenshots.add_tag) through
+        the rate limiter and retries, for callers outside this class.
+        '''
+        return self._retry(fn, *args, **kwargs)
+
+    def add_storage(self, file) -> dict:
+        def upload():
+            # Rewind so a retried upload sends the whole file again
+            file.seek(0)
+            return self.storages.add_storage(file)
+
+        return self._retry(upload)
+
+    def iter_pages(
+        self, method, *args, page_size: int = 500, max_workers: int = 8, **kwargs
+    ):
+        '''
+        Yields list responses page by page, fetching them in parallel batches.
+
+        Crowdin doesn't report the total count, so after the first full page
+        the next max_workers pages are requested at once until one comes short.
+        Stops after the first response without data (yields it too).
+        Only one batch of pages is kept in memory at a time.
+        '''
+        page = self._retry(method, *args, limit=page_size, offset=0, **kwargs)
+        yield page
+        if 'data' not in page or len(page['data']) < page_size:
             return
-        print('E | ', message, *args, kwargs)
+
+        max_workers = max(1, max_workers)
+        offset = page_size
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                offsets = [offset + i * page_size for i in range(max_workers)]
+                for page in executor.map(
+                    lambda o: self._retry(
+                        method, *args, limit=page_size, offset=o, **kwargs
+                    ),
+                    offsets,
+                ):
+                    yield page
+                    if 'data' not in page or len(page['data']) < page_size:
+                        return
+                offset = offsets[-1] + page_size
+
+    def fetch_all_pages(self, method, *args, **kwargs) -> dict:
+        '''
+        Same as with_fetch_all() but fetches pages in parallel batches.
+        Returns {'data': [...]} or the first response without data.
+        '''
+        data = []
+        for page in self.iter_pages(method, *args, **kwargs):
+            if 'data' not in page:
+                return page
+            data.extend(page['data'])
+
+        return {'data': data}
 
     def get_file_ID(self, file_name='Game.po') -> int:
         if not self.file_list:
             self.update_file_list_and_project_data()
 
-        for entry in self.file_list:
-            if entry['data']['name'] == file_name:
-                return entry['data']['id']
+        file_id = self._file_ids.get(file_name)
+        if file_id is not None:
+            return file_id
 
         self.warning(
-            f'Couldn\'t find the file: {file_name}. File list: {self.file_list}'
+            'Couldn\'t find the file: {}. File list: {}', file_name, self.file_list
         )
         return None
 
-    def update_file_list_and_project_data(self):
-        self.file_list = self.source_files.list_files(self.project_id).get('data', None)
+    def update_file_list_and_project_data(self, refresh: bool = False):
+        if (
+            not refresh
+            and self._project_data_time is not None
+            and time() - self._project_data_time < self.project_data_ttl
+        ):
+            return None
+
+        self.file_list = self.fetch_all_pages(
+            self.source_files.list_files, self.project_id
+        ).get('data', None)
+        # Reversed so the first file wins for duplicate names, same as a scan
+        self._file_ids = {
+            entry['data']['name']: entry['data']['id']
+            for entry in reversed(self.file_list or [])
+        }
 
-        self.data['project_data'] = self.projects.get_project(self.project_id).get(
-            'data', None
-        )
+        self.data['project_data'] = self._retry(
+            self.projects.get_project, self.project_id
+        ).get('data', None)
 
-        # TODO: make sure we get all languages via pagination
-        self.data['supported_languages'] = self.languages.list_supported_languages(
-            limit=500
+        self.data['supported_languages'] = self.fetch_all_pages(
+            self.languages.list_supported_languages
         ).get('data', None)
 
         if (
@@ -85,49 +331,57 @@ class UECrowdinClient(CrowdinClient):
             and self.data['supported_languages']
         ):
             self.info('Crowdin module: fetched file list and project data')
+            self._project_data_time = time()
         else:
             self.warning(
-                f'Crowdin module: somethings wrong with file list and project data\n'
-                f'File list: {self.file_list}\n'
-                f'Project data: {self.data["project_data"]}\n'
+                'Crowdin module: somethings wrong with file list and project data\n'
+                'File list: {}\n'
+                'Project data: {}\n',
+                self.file_list,
+                self.data['project_data'],
             )
 
         return None
 
     def check_or_build(self, build_data: dict = None):
         if not build_data:
-            return self.translations.build_crowdin_project_translation(self.project_id)[
-                'data'
-            ]
+            return self._retry(
+                self.translations.build_crowdin_project_translation, self.project_id
+            )['data']
         if 'id' not in build_data:
-            self.error(f'No build ID in build data. Build data:\n{build_data}')
+            self.error('No build ID in build data. Build data:\n{}', build_data)
             return None
 
-        return self.translations.download_project_translations(
-            self.project_id, build_data['id']
+        return self._retry(
+            self.translations.download_project_translations,
+            self.project_id,
+            build_data['id'],
         )['data']
 
     def get_or_create_directory(self, dir, create: bool = True):
         if not dir:
             return None
-        r = self.source_files.list_directories(self.project_id)
-        if 'data' not in r:
-            self.error(f'No data in list directories response. Response: {r}')
-            return r
+        if self._dir_ids is None:
+            r = self._retry(self.source_files.list_directories, self.project_id)
+            if 'data' not in r:
+                self.error('No data in list directories response. Response: {}', r)
+                return r
 
-        directories = {d['data']['name']: d['data']['id'] for d in r['data']}
+            self._dir_ids = {d['data']['name']: d['data']['id'] for d in r['data']}
 
-        if directories and dir in directories:
-            return directories[dir]
+        if dir in self._dir_ids:
+            return self._dir_ids[dir]
 
         if not create:
             return None
 
-        r = self.source_files.add_directory(self.project_id, dir)
+        r = self._retry(self.source_files.add_directory, self.project_id, dir)
         if 'data' not in r:
-            self.error(f'No data in create directory response. Response: {r}')
+            self.error('No data in create directory response. Response: {}', r)
             return r
 
+        self._dir_ids[dir] = r['data']['id']
+
         return r['data']['id']
 
     def add_file(
@@ -137,11 +391,11 @@ class UECrowdinClient(CrowdinClient):
         type: str = 'auto',
         export_pattern: str = '',
     ) -> int or str:
-        with open(filepath, mode='rb') as file:
-            storage = self.storages.add_storage(file)
+        with open(filepath, mode='rb', buffering=UPLOAD_BUFFER_SIZE) as file:
+            storage = self.add_storage(file)
 
         if 'data' not in storage or 'id' not in storage['data']:
-            self.error(f'Error, no storage ID recieved. Response:\n{storage}')
+            self.error('Error, no storage ID recieved. Response:\n{}', storage)
             return storage
 
         self.info(f'{filepath.name} uploaded to storage. Updating file...')
@@ -151,7 +405,8 @@ class UECrowdinClient(CrowdinClient):
             dir_id = self.get_or_create_directory(dir)
 
         if dir_id:
-            response = self.source_files.add_file(
+            response = self._retry(
+                self.source_files.add_file,
                 self.project_id,
                 storage['data']['id'],
                 filepath.name,
@@ -160,7 +415,8 @@ class UECrowdinClient(CrowdinClient):
                 exportOptions={'exportPattern': export_pattern},
             )
         else:
-            response = self.source_files.add_file(
+            response = self._retry(
+                self.source_files.add_file,
                 self.project_id,
                 storage['data']['id'],
                 filepath.name,
@@ -169,11 +425,82 @@ class UECrowdinClient(CrowdinClient):
             )
 
         if 'data' not in response:
-            self.error(f'No data in response. Response:\n{response}')
+            self.error('No data in response. Response:\n{}', response)
             return response
 
+        self._file_ids.setdefault(filepath.name, response['data']['id'])
+
         return response['data']['id']
 
+    def add_files(
+        self, export_patterns: dict[Path, str], max_workers: int = 8, **kwargs
+    ) -> dict[Path, int or dict]:
+        '''
+        Adds files in parallel, each with its own export pattern:
+        {filepath: export pattern}. Other keyword arguments are passed to add_file.
+        Returns {filepath: file ID or last response/error}.
+        '''
+
+        def add(filepath: Path):
+            try:
+                return self.add_file(
+                    filepath, export_pattern=export_patterns[filepath], **kwargs
+                )
+            except Exception as err:
+                self.error(f'Failed to add {filepath}: {err}')
+                return err
+
+        return self._map_files(add, list(export_patterns), max_workers)
+
+    def update_files(
+        self, filepaths: list[Path], max_workers: int = 8
+    ) -> dict[Path, int or dict]:
+        '''
+        Updates files in parallel.
+        Returns {filepath: file ID or last response/error}.
+        '''
+        # Fetch the file list once before the threads need it
+        self.update_file_list_and_project_data()
+
+        def update(filepath: Path):
+            try:
+                return self.update_file(filepath)
+            except Exception as err:
+                self.error(f'Failed to update {filepath}: {err}')
+                return err
+
+        return self._map_files(update, filepaths, max_workers)
+
+    def _map_files(self, fn, filepaths: list[Path], max_workers: int) -> dict:
+        # Files are opened inside the workers, so only max_workers are open at once
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(filepaths)))
+        ) as executor:
+            return dict(zip(filepaths, executor.map(fn, filepaths)))
+
+    def _get_uploaded_files(self) -> dict:
+        # {file ID: [content hash, revision ID]} of files uploaded from here
+        with self._uploaded_files_lock:
+            if self._uploaded_files is None:
+                self._uploaded_files = (
+                    read_json_cache(
+                        self.uploaded_files_cache_path,
+                        self.uploaded_files_cache_ttl_hours,
+                        key=self.project_id,
+                    )
+                    or {}
+                )
+            return self._uploaded_files
+
+    def _save_uploaded_file(self, file_id: int, file_hash: str, revision_id: int):
+        uploaded_files = self._get_uploaded_files()
+        with self._uploaded_files_lock:
+            uploaded_files[str(file_id)] = [file_hash, revision_id]
+            if self.uploaded_files_cache_ttl_hours:
+                write_json_cache(
+                    self.uploaded_files_cache_path, uploaded_files, key=self.project_id
+                )
+
     def update_file(self, filepath: Path, fname: str = None, fID: int = None):
         if fname:
             file_name = fname
@@ -185,38 +512,56 @@ class UECrowdinClient(CrowdinClient):
         else:
             file_id = fID
 
-        file_data = self.source_files.get_file(self.project_id, file_id)
+        file_data = self._retry(self.source_files.get_file, self.project_id, file_id)
 
         if 'revisionId' not in file_data['data']:
             self.error(
-                f'No revision ID for {file_name} ({file_id}) found. File data:\n',
+                'No revision ID for {} ({}) found. File data:\n{}',
+                file_name,
+                file_id,
                 file_data,
             )
             return file_data
 
+        file_hash = file_sha256(filepath)
+        if self._get_uploaded_files().get(str(file_id)) == [
+            file_hash,
+            file_data['data']['revisionId'],
+        ]:
+            self.info(
+                f'{file_name} ({file_id}) unchanged since the last upload '
+                f'(revision {file_data["data"]["revisionId"]}). Skipping upload.'
+            )
+            return file_id
+
         self.info(
             f'Current revision: {file_data["data"]["revisionId"]}. Uploading file...'
         )
 
-        with open(filepath, mode='rb') as file:
-            storage = self.storages.add_storage(file)
+        with open(filepath, mode='rb', buffering=UPLOAD_BUFFER_SIZE) as file:
+            storage = self.add_storage(file)
 
         if 'data' not in storage or 'id' not in storage['data']:
-            self.error(f'Error, no storage ID recieved. Response:\n{storage}')
+            self.error('Error, no storage ID recieved. Response:\n{}', storage)
             return storage
 
         self.info('Uploaded to storage. Updating file...')
 
-        response = self.source_files.update_file(
-            self.project_id, file_id, storage['data']['id']
+        response = self._retry(
+            self.source_files.update_file,
+            self.project_id,
+            file_id,
+            storage['data']['id'],
         )
 
         if 'data' not in response or 'revisionId' not in response['data']:
             self.error(
-                f'No data or revision ID in updated file data. Response:\n{response}'
+                'No data or revision ID in updated file data. Response:\n{}', response
             )
             return response
 
+        self._save_uploaded_file(file_id, file_hash, response['data']['revisionId'])
+
         if response['data']['revisionId'] > file_data['data']['revisionId']:
             self.info(
                 f'{file_name} ({file_id}) updated. '
@@ -233,66 +578,102 @@ class UECrowdinClient(CrowdinClient):
 
         return response['data']['id']
 
-    def get_top_translators(self):
-        self.update_file_list_and_project_data()
+    def get_top_translators_report(self, language_id: str) -> dict:
+        self.info(f'Creating report for language: {language_id}')
 
-        language_ids = self.data['project_data']['targetLanguageIds']
+        resp = self._retry(
+            self.reports.generate_top_members_report,
+            self.project_id,
+            languageId=language_id,
+            format='json',
+        )
 
-        reports = dict.fromkeys(sorted(language_ids))
-        # TODO: make this a parameter instead of hardcoded EN locale
-        reports.pop('en', None)
+        if 'data' not in resp:
+            self.error('No data in report generation response. Response: {}', resp)
+            return resp
+
+        report = {'report_id': resp['data']['identifier']}
+
+        # Wait about as long as previous reports took before the first check,
+        # then back off exponentially (with jitter, as reports run in parallel)
+        started = time()
+        delay = 1.0
+        if self._report_ready_samples:
+            delay = min(max(delay, median(self._report_ready_samples[-10:])), 30.0)
+        last_poll = started
+        # The report got ready somewhere between the last check that saw it
+        # unfinished and the one that saw it finished
+        last_unfinished = started
+        report_status = ''
+        while True:
+            sleep(delay + uniform(0, delay * 0.1))
+            delay = min(delay * 1.7, 30.0)
+
+            report_status = self._retry(
+                self.reports.check_report_generation_status,
+                self.project_id,
+                report['report_id'],
+            )['data']['status']
+            if report_status == 'finished':
+                break
+            last_unfinished = time()
+
+            # check if last poll was more than a minute ago
+            if (time() - last_poll) > 29:
+                self.info(f'Checking report status... Language: {language_id}')
+                last_poll = time()
+
+        self._report_ready_samples.append((last_unfinished + time()) / 2 - started)
+
+        self.info(f'Report for language {language_id} ready. Downloading...')
+
+        data = self.session.get(
+            self._retry(
+                self.reports.download_report, self.project_id, report['report_id']
+            )['data']['url'],
+            timeout=30,
+        )
+        data.raise_for_status()
+        rep = data.json()
+        self.info(f'Downloaded report for culture: {rep["language"]["name"]}')
+        report['language_id'] = 'CreditsLang' + NON_WORD_REGEX.sub(
+            '', rep['language']['name']
+        )
+        report['language_name'] = LANGUAGE_REGION_REGEX.sub(
+            r' (\1)', rep['language']['name']
+        ).replace(',', '')
+        if 'data' in rep:
+            report['data'] = rep['data']
+        else:
+            report['data'] = None
+            self.warning(f'*** No data for culture: {rep["language"]["name"]}')
 
-        self.info('Creating per-language reports on Crowdin...')
+        return report
 
-        for report in reports:
-            reports[report] = {}
+    def get_top_translators(self, max_workers: int = 8):
+        self.update_file_list_and_project_data()
 
-            self.info(f'Creating report for language: {report}')
+        language_ids = sorted(self.data['project_data']['targetLanguageIds'])
+        # TODO: make this a parameter instead of hardcoded EN locale
+        language_ids = [id for id in language_ids if id != 'en']
 
-            resp = self.reports.generate_top_members_report(
-                self.project_id, languageId=report, format='json'
-            )
+        self.info('Creating per-language reports on Crowdin...')
 
-            if 'data' not in resp:
-                self.error(f'No data in report generation response. Response: {resp}')
-                return resp
-
-            reports[report]['report_id'] = resp['data']['identifier']
-
-            last_poll = time()
-            report_status = ''
-            while report_status != 'finished':
-                # check if last poll was more than a minute ago
-                if (time() - last_poll) > 29:
-                    self.info(f'Checking report status... Language: {report}')
-                    last_poll = time()
-
-                report_status = self.reports.check_report_generation_status(
-                    self.project_id, reports[report]['report_id']
-                )['data']['status']
-
-                sleep(10)
-
-            self.info(f'Report for language {report} ready. Downloading...')
-
-            with urllib.request.urlopen(
-                self.reports.download_report(
-                    self.project_id, reports[report]['report_id']
-                )['data']['url']
-            ) as data:
-                rep = json.loads(data.read().decode())
-                self.info(f'Downloaded report for culture: {rep["language"]["name"]}')
-                reports[report]['language_id'] = 'CreditsLang' + re.sub(
-                    r'[^\w]', '', rep['language']['name']
-                )
-                reports[report]['language_name'] = re.sub(
-                    r',', '', re.sub(r', (.*)$', r' (\1)', rep['language']['name'])
+        # Reports are generated on Crowdin's side, so wait for them in parallel
+        # (max_workers bounds the reports in progress, _retry bounds the rate)
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(language_ids)))
+        ) as executor:
+            reports = dict(
+                zip(
+                    language_ids,
+                    executor.map(self.get_top_translators_report, language_ids),
                 )
-                if 'data' in rep:
-                    reports[report]['data'] = rep['data']
-                else:
-                    reports[report]['data'] = None
-                    self.warning(f'*** No data for culture: {rep["language"]["name"]}')
+            )
+
+        for report in reports.values():
+            if 'language_id' not in report:
+                return report
 
         return reports
 
@@ -309,15 +690,17 @@ class UECrowdinClient(CrowdinClient):
             for e in supported_languages
             if e['data']['id'] in language_ids
         }
-        language_mappings = dict(zip(language_ids, language_ids))
-        for m in language_mappings:
-            if m in project_data['languageMapping']:
-                language_mappings[m] = project_data['languageMapping'][m]['locale']
-            elif m in language_locales:
-                language_mappings[m] = language_locales[m]
+        # Project language mapping first, then Crowdin locale, then the ID itself
+        project_mappings = project_data['languageMapping'] or {}
+        language_mappings = {
+            m: project_mappings.get(m, {}).get('locale') or language_locales.get(m, m)
+            for m in language_ids
+        }
 
-        self.info(f'Language IDs ({len(language_ids)}): {language_ids}')
-        self.info(f'Language mappings ({len(language_mappings)}): {language_mappings}')
+        self.info('Language IDs ({}): {}', len(language_ids), language_ids)
+        self.info(
+            'Language mappings ({}): {}', len(language_mappings), language_mappings
+        )
 
         game_po_id = self.get_file_ID(filename)
 
@@ -325,8 +708,10 @@ class UECrowdinClient(CrowdinClient):
             self.error(f'Couldn\'t find {filename}, aborting. Response: {game_po_id}')
             return None
 
-        game_po_progress = self.translation_status.get_file_progress(
-            projectId=self.project_id, fileId=game_po_id, offset=0, limit=100
+        game_po_progress = self.fetch_all_pages(
+            self.translation_status.get_file_progress,
+            projectId=self.project_id,
+            fileId=game_po_id,
         )['data']
 
         completion_rates = {}
@@ -1,11 +1,25 @@
 # Holds utility functions used across scripts:
 # read and update configs, etc.
 
+import os
+import csv
 import sys
+import gzip
+import json
+from time import time
 from pathlib import Path
 import yaml
 from dataclasses import asdict, dataclass, fields
 import argparse
+from copy import deepcopy
+from functools import lru_cache
+from contextlib import contextmanager
+
+# Use the libyaml C parser if PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
 BASE_CFG = 'base.config.yaml'
 SECRET_CFG = 'crowdin.config.yaml'
@@ -41,6 +55,135 @@ def init_logging(logger):
     )
 
 
+@lru_cache(maxsize=16)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int):
+    # mtime and size are only part of the cache key, to reparse changed files
+    # Read the file in one go so the parser scans a buffer instead of
+    # calling back into a Python file object (YAML is UTF-8 unless it has a BOM)
+    return yaml.load(Path(path).read_bytes(), Loader=YamlLoader)
+
+
+def load_yaml(path: Path):
+    '''
+    Same as yaml.safe_load on the file, but with the C loader when available.
+    Parsed files are cached until they change on disk; callers get a copy.
+    '''
+    path = Path(path).resolve()
+    stat = path.stat()
+    return deepcopy(_load_yaml_cached(str(path), stat.st_mtime_ns, stat.st_size))
+
+
+@contextmanager
+def atomic_open(path: Path, mode: str = 'w', opener=open, **kwargs):
+    '''
+    Opens a temp file next to path for writing and replaces path with it
+    once the block succeeds, so a crash mid-write never leaves a truncated
+    file behind. The temp file is removed if the block fails.
+    Keyword arguments are passed to opener.
+    '''
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        with opener(tmp, mode=mode, **kwargs) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def write_csv(path: Path, rows, encoding: str = 'utf-8', fields: list = None):
+    '''
+    Writes rows (and the fields header, if any) to the CSV with atomic_open.
+    '''
+    with atomic_open(
+        path, encoding=encoding, newline='', buffering=1 << 20
+    ) as csv_file:
+        csv_writer = csv.writer(csv_file)
+        if fields:
+            csv_writer.writerow(fields)
+        csv_writer.writerows(rows)
+
+
+def read_json_cache(path: Path, ttl_hours: float, key=None):
+    '''
+    Returns data saved with write_json_cache if it was saved with the same key
+    less than ttl_hours ago. Returns None if there's no usable cache.
+    Files ending with .gz are gzipped.
+    '''
+    path = Path(path)
+    if not ttl_hours or not path.exists():
+        return None
+
+    try:
+        with (gzip.open if path.suffix == '.gz' else open)(
+            path, mode='rt', encoding='utf-8'
+        ) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        cached.get('key') != key
+        or time() - cached.get('timestamp', 0) > ttl_hours * 3600
+    ):
+        return None
+
+    return cached.get('data', None)
+
+
+def write_json_cache(path: Path, data, key=None):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_open(
+        path,
+        mode='wt',
+        opener=gzip.open if path.suffix == '.gz' else open,
+        encoding='utf-8',
+    ) as f:
+        json.dump({'key': key, 'timestamp': time(), 'data': data}, f)
+
+
+def cached_json(
+    path: Path, ttl_hours: float, fetch, key=None, refresh: bool = False, logger=None
+):
+    '''
+    Returns the data cached at path with the same key less than ttl_hours ago,
+    or calls fetch() and caches its result if it's not empty.
+    ttl_hours = 0 disables the cache, refresh = True (--refresh-cache) skips it.
+    '''
+    data = None if refresh else read_json_cache(path, ttl_hours, key=key)
+    if data:
+        if logger:
+            logger.info(f'Using cached data from {path}.')
+        return data
+
+    data = fetch()
+    if data and ttl_hours:
+        write_json_cache(path, data, key=key)
+
+    return data
+
+
+def refresh_cache_requested() -> bool:
+    '''
+    Checks if the script was run with --refresh-cache.
+    '''
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--refresh-cache', dest='refresh_cache', action='store_true')
+
+    return parser.parse_known_args()[0].refresh_cache
+
+
+@lru_cache(maxsize=None)
+def config_field_names(cls) -> frozenset:
+    '''
+    Names of the dataclass fields that can be set from config files
+    (private fields starting with _ can't).
+    '''
+    return frozenset(f.name for f in fields(cls) if not f.name.startswith('_'))
+
+
 @dataclass
 class LocTask:
     # TODO: Add some default parameters? Paths?
@@ -78,6 +221,15 @@ class LocTask:
 
         return parser.parse_known_args()[0].tasklist
 
+    def _apply_config(self, params: dict, field_names: frozenset) -> bool:
+        '''
+        Sets the parameters that are fields of the task. Returns True if any were set.
+        '''
+        keys = params.keys() & field_names
+        for key in keys:
+            setattr(self, key, params[key])
+        return bool(keys)
+
     def read_config(
         self,
         script: str,
@@ -97,64 +249,44 @@ class LocTask:
             logger.error('No config found!')
             raise ValueError('No config found!')
 
-        with open(base_config, mode='r', encoding='utf-8') as f:
-            yaml_config = yaml.safe_load(f)
-
-        # Update config from the defaults section of base config
-        updated = False
-        if script in yaml_config['script-parameters']:
-            for key, value in yaml_config['script-parameters'][script].items():
-                if not key.startswith('_') and key in [
-                    field.name for field in fields(self)
-                ]:
-                    updated = True
-                    self.__setattr__(key, value)
-            if updated:
-                logger.info(
-                    'Updated parameters from global section of base.config.yaml.'
-                )
-
-        # Update config with overrides from the 'task list' section of base config
-        updated = False
+        yaml_config = load_yaml(base_config)
+
+        field_names = config_field_names(type(self))
+
+        # Merge all config layers first, later ones override earlier ones,
+        # then set the task fields in one pass
+        merged = {}
+
+        # Defaults section of base config
+        params = yaml_config['script-parameters'].get(script) or {}
+        if params.keys() & field_names:
+            logger.info('Updated parameters from global section of base.config.yaml.')
+        merged.update(params)
+
+        # Overrides from the 'task list' section of base config
         if task_list and task_list in yaml_config:
-            task_id = [
-                i
-                for i, val in enumerate(yaml_config[task_list])
-                if val['script'] == script
-            ]
-            if task_id and 'script-parameters' in yaml_config[task_list][task_id[0]]:
-                logger.info(
-                    'Updated parameters from tasklist section of base.config.yaml.'
-                )
-                for key, value in yaml_config[task_list][task_id[0]][
-                    'script-parameters'
-                ].items():
-                    if not key.startswith('_') and key in [
-                        field.name for field in fields(self)
-                    ]:
-                        updated = True
-                        self.__setattr__(key, value)
-                if updated:
+            task = next(
+                (t for t in yaml_config[task_list] if t['script'] == script), None
+            )
+            if task and 'script-parameters' in task:
+                params = task['script-parameters'] or {}
+                if params.keys() & field_names:
                     logger.info(
                         f'Updated parameters from {task_list} '
                         'section of base.config.yaml.'
                     )
+                merged.update(params)
 
         if not secret_config:
             secret_config = self.secret_cfg
 
-        # Update Crowdin API config if exists
+        # Crowdin API config, if exists
         if secret_config and Path(secret_config).exists():
-            with open(secret_config, mode='r', encoding='utf-8') as f:
-                yaml_config = yaml.safe_load(f)
+            merged.update(load_yaml(secret_config)['crowdin'])
 
-            for key, value in yaml_config['crowdin'].items():
-                if not key.startswith('_') and key in [
-                    field.name for field in fields(self)
-                ]:
-                    self.__setattr__(key, value)
+        self._apply_config(merged, field_names)
 
-        if 'token' in fields(self) and not self.token:
+        if 'token' in field_names and not self.token:
             logger.error('API token parameter exists but not set!')
 
         # Run post_update to compute derivative parameters, if any
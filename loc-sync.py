@@ -2,7 +2,7 @@ import sys
 import argparse
 import subprocess as subp
 
-from libraries.utilities import init_logging
+from libraries.utilities import init_logging, load_yaml
 
 err = None
 # Run with -setup to install required modules
@@ -10,7 +10,6 @@ err = None
 # (generated with pipreqs .)
 
 try:
-    import yaml
     from pathlib import Path
     from timeit import default_timer as timer
     import re
@@ -37,10 +36,8 @@ def read_config_files(base_cfg=BASE_CFG, secret_cfg=SECRET_CFG):
     '''
     if not secret_cfg:
         secret_cfg = SECRET_CFG
-    with open(base_cfg) as f:
-        config = yaml.safe_load(f)
-    with open(secret_cfg) as f:
-        crowdin_cfg = yaml.safe_load(f)
+    config = load_yaml(base_cfg)
+    crowdin_cfg = load_yaml(secret_cfg)
 
     config['crowdin']['api-token'] = ''
     for key in config['crowdin']:
@@ -263,7 +260,7 @@ def main():
 
         if skip_task:
             logger.info(reason)
-            tasks_done += [[task, reason, '—']]
+            tasks_done.append([task, reason, '—'])
             continue
 
         if 'unreal' in task:
@@ -316,7 +313,7 @@ def main():
 
         task_elapsed = timer() - task_start
 
-        tasks_done += [[task, f'{task_elapsed:.2f} sec.', f'Return code: {returncode}']]
+        tasks_done.append([task, f'{task_elapsed:.2f} sec.', f'Return code: {returncode}'])
 
         logger.info(f'Execution time: {task_elapsed:.2f} sec.')
 
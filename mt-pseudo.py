@@ -389,7 +389,9 @@ class MTPseudo(LocTask):
         task.culture_mappings.update(self.languages)
         print(task) # Print to avoid logging tokens
 
-        task.build_and_download()
+        if not task.build_and_download():
+            logger.error('Could not build and download translations. Aborting!')
+            return None
 
         task.unzip_file()
 
@@ -715,7 +717,8 @@ def main():
 
     task.approve_languages()
 
-    task.download_transalted_files()
+    if not task.download_transalted_files():
+        return 1
 
     # task.pseudo_mark_targets()
 
@@ -141,7 +141,7 @@ class ProcessTestAndHashLocales(LocTask):
         comments = []
         for [prop, crit, comment] in self.comments_criteria:
             if re.search(crit, getattr(entry, prop)):
-                comments += [comment]
+                comments.append(comment)
         return comments
 
     def should_delete_comment(self, comment: str) -> bool:
@@ -374,7 +374,7 @@ class ProcessTestAndHashLocales(LocTask):
             usage_references = self.get_references_for_key(entry.msgctxt)
 
             if usage_references:
-                new_comments += ['Used in:']
+                new_comments.append('Used in:')
                 new_comments += usage_references
 
             entry.comment = (
@@ -384,8 +384,18 @@ class ProcessTestAndHashLocales(LocTask):
             if self.delete_occurrences:
                 entry.occurrences = []
 
+        # Single pass over the entries for both the ID check and the rate
+        # (percent_translated() would walk the whole PO two more times)
+        ids = []
+        total = 0
+        for entry in po:
+            if entry.obsolete:
+                continue
+            total += 1
+            if entry.translated():
+                ids.append(entry.msgstr)
+
         # TODO: Check for duplicate IDs across all targets
-        ids = [entry.msgstr for entry in po.translated_entries()]
         if len(set(ids)) != len(ids):
             logger.error(
                 'Duplicate #IDs spotted, please recompile the debug IDs from scratch (use CLEAR_TRANSLATIONS = True)'
@@ -393,7 +403,7 @@ class ProcessTestAndHashLocales(LocTask):
 
         logger.info(
             'Target file translation rate: {rate:.0%}'.format(
-                rate=po.percent_translated() / 100
+                rate=int(len(ids) * 100 / total) / 100 if total else 1
             )
         )
         logger.info(f'Last used ID: {current_id-1}')
@@ -29,6 +29,8 @@ class UpdateSourceFile(LocTask):
 
     encoding: str = 'utf-8-sig'  # PO file encoding
 
+    max_parallel_uploads: int = 8  # Files uploaded (and open) at once
+
     manual_upload: bool = False
 
     wait_for_upload_confirmation: bool = False
@@ -51,6 +53,7 @@ class UpdateSourceFile(LocTask):
     # TODO: Do I need this here? Or rather in smth from uetools lib?
     content_dir: str = '../'
     temp_dir: str = 'Localization/~Temp/FilesToUpload'
+    uploaded_files_cache_path: str = 'Localization/~Temp/Cache/uploaded-files.json'
 
     _fname: str = 'Localization/{target}/{locale}/{target}.po'
 
@@ -87,6 +90,9 @@ class UpdateSourceFile(LocTask):
         crowdin = UECrowdinClient(
             self.token, logger, self.organization, self.project_id
         )
+        crowdin.uploaded_files_cache_path = (
+            self._content_path / self.uploaded_files_cache_path
+        )
 
         crowdin.update_file_list_and_project_data()
 
@@ -95,6 +101,8 @@ class UpdateSourceFile(LocTask):
         logger.info(f'Content path: {self._content_path}')
 
         targets_processed = []
+        # Files to upload to Crowdin, uploaded in parallel after filtering
+        fpaths = {}
 
         for target in self.loc_targets:
             fpath = self._content_path / self._fname.format(target=target)
@@ -112,15 +120,21 @@ class UpdateSourceFile(LocTask):
                 targets_processed.append(target)
                 continue
             
-            logger.info(f'Uploading file: {fpath}')
-            r = crowdin.update_file(fpath)
-            if isinstance(r, int):
-                targets_processed.append(target)
-                logger.info('File updated.')
-            else:
-                logger.error(
-                    f'Something went wrong. Here\'s the last response from Crowdin: {r}'
-                )
+            fpaths[fpath] = target
+
+        if fpaths:
+            logger.info(f'Uploading files ({len(fpaths)}): {list(fpaths)}')
+            results = crowdin.update_files(
+                list(fpaths), max_workers=self.max_parallel_uploads
+            )
+            for fpath, r in results.items():
+                if isinstance(r, int):
+                    targets_processed.append(fpaths[fpath])
+                    logger.info(f'File updated: {fpath.name}')
+                else:
+                    logger.error(
+                        f'Something went wrong. Here\'s the last response from Crowdin: {r}'
+                    )
 
         if self.manual_upload:
             logger.info('Created files to upload to Crowdin manually. Openning folder...')